@@ -73,6 +73,17 @@ declare -a REPLACEMENTS=(
 # If false, will match patterns case-insensitively
 CASE_SENSITIVE=true
 
+# File extensions never scanned for content replacement (Python version)
+# Space-separated; files with these extensions are still copied/renamed.
+# If unset, a built-in list of common image/archive/binary/font types is used.
+# BINARY_EXTENSIONS=".png .jpg .gif .pdf .zip .jar .so .pyc"
+
+# Directories skipped when scanning repositories (Python version)
+# Space-separated names or glob patterns (e.g. *.egg-info); matching directories
+# anywhere in the tree are not descended into. .git is always skipped. If unset,
+# common dependency and cache directories are skipped (node_modules .venv ...).
+# SKIP_DIRS="node_modules .venv venv __pycache__ *.egg-info build dist target"
+
 #############################################################
 # Working Directory
 #############################################################
@@ -80,6 +91,19 @@ CASE_SENSITIVE=true
 # Working directory for cloning repos (will be created if it doesn't exist)
 WORK_DIR="./repos_temp"
 
+# Clone depth for new clones (Python version)
+# Repositories are cloned as partial, single-branch clones. If unset, runs
+# without push (-p) also clone only the latest commit (depth 1) and pushing
+# runs clone full history. Set to a number to force a depth, or 0 for full history.
+# CLONE_DEPTH=1
+
+# Number of repositories processed at the same time (Python version)
+# If unset, twice the number of CPU cores is used (the work is mostly waiting
+# on git and the network). Lower it when running several copies of the script,
+# e.g. through parallel-run.sh; -s/--sequential forces 1. With more than one
+# worker git never prompts for credentials (GIT_TERMINAL_PROMPT=0).
+# REPO_WORKERS=4
+
 #############################################################
 # Git Configuration
 #############################################################
@@ -10,14 +10,61 @@ import os
 import sys
 import subprocess
 import argparse
+import codecs
+import errno
+import fnmatch
+import io
+import functools
+import shlex
 import shutil
 import re
+import tempfile
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import AnyStr, List, Tuple, Dict, Iterator, Optional, Pattern
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# config.sh parsing: simple VAR=value assignments (one per line, surrounding
+# whitespace ignored), ${VAR:-default} / ${VAR} substitutions and the
+# REPLACEMENTS array
+_VAR_RE = re.compile(r'^[^\S\n]*([A-Z_]+)=(?![^\S\n]*$)(["\']?)(.+?)\2[^\S\n]*$', re.MULTILINE)
+_DEFAULT_SUBST_RE = re.compile(r'\$\{([^}]+):-([^}]*)\}')
+_VAR_SUBST_RE = re.compile(r'\$\{([^}]+)\}')
+_REPLACEMENTS_RE = re.compile(r'declare -a REPLACEMENTS=\((.*?)\)', re.DOTALL)
 
 
 class GitFileRename:
+    _CURRENT_BRANCH_QUERY = ('branch', '--show-current')
+    
+    # Linux ioctl cloning a file's data as a copy-on-write reflink
+    _FICLONE = 0x40049409
+    
+    # Threads used to overlap file reads/writes within a repository; below
+    # _MIN_PARALLEL_FILES files, starting them costs more than it saves
+    _FILE_WORKERS = 8
+    _MIN_PARALLEL_FILES = 16
+    
+    # Files larger than _STREAM_THRESHOLD are rewritten in _STREAM_CHUNK pieces
+    # instead of being read into memory whole
+    _STREAM_CHUNK = 1 << 20
+    _STREAM_THRESHOLD = 4 * _STREAM_CHUNK
+    
+    # Extensions never considered for content replacement (checked before any I/O)
+    _DEFAULT_BINARY_EXTENSIONS = (
+        '.png .jpg .jpeg .gif .ico .webp .pdf .zip .tar .gz .tgz .bz2 .xz .7z '
+        '.so .a .o .dll .exe .pyc .jar .class .bin .wasm .mp3 .mp4 '
+        '.woff .woff2 .ttf .otf .eot'
+    )
+    # Dependency/cache directories that are never part of the source
+    _DEFAULT_SKIP_DIRS = 'node_modules .venv venv __pycache__ .mypy_cache .pytest_cache'
+    
     def __init__(self, config_vars: Dict[str, str]):
         """Initialize with configuration variables from config.sh"""
         self.config = config_vars
@@ -35,6 +82,19 @@ class GitFileRename:
         self.case_sensitive = config_vars.get('CASE_SENSITIVE', 'true').lower() == 'true'
         self.work_dir = Path(config_vars.get('WORK_DIR', './repos_temp'))
         self.commit_message = config_vars.get('COMMIT_MESSAGE', 'Update string replacements across repository')
+        self.clone_depth = config_vars.get('CLONE_DEPTH', '')
+        self.repo_workers = config_vars.get('REPO_WORKERS', '')
+        self._binary_exts = frozenset(
+            '.' + ext.lstrip('.').lower()
+            for ext in config_vars.get('BINARY_EXTENSIONS', self._DEFAULT_BINARY_EXTENSIONS).split()
+        )
+        # Directories not descended into when scanning a repository (.git never is).
+        # Plain names are looked up in a set; glob patterns are compiled once
+        # into a single regex
+        self._skip_patterns = sorted(set(config_vars.get('SKIP_DIRS', self._DEFAULT_SKIP_DIRS).split()) | {'.git'})
+        skip_globs = [pattern for pattern in self._skip_patterns if any(c in pattern for c in '*?[')]
+        self._skip_dirs = frozenset(self._skip_patterns) - frozenset(skip_globs)
+        self._skip_glob = re.compile('|'.join(map(fnmatch.translate, skip_globs))).match if skip_globs else None
         
         # Ensure log file is always at top level (current directory where script is run)
         log_file_path = config_vars.get('LOG_FILE', './batch_update_log.txt')
@@ -45,10 +105,22 @@ class GitFileRename:
             self.log_file = Path(log_file_path)
         
         self.fix_mode = config_vars.get('FIX_MODE', 'false').lower() == 'true'
+        self.sequential = False
         
         # Parse replacements
         self.replacements = self._parse_replacements(config_vars.get('REPLACEMENTS', ''))
         
+        # One alternation regex per set of replacements, so content is scanned
+        # once; ASCII-only sets also get a bytes version (None otherwise)
+        self._matcher_cache: Dict[Tuple[Tuple[str, str], ...], Tuple[Pattern[str], Dict[str, str]]] = {}
+        self._bytes_matcher_cache: Dict[Tuple[Tuple[str, str], ...], Optional[Tuple[Pattern[bytes], Dict[bytes, bytes]]]] = {}
+        
+        # Name needles per replacement: old strings select items to copy,
+        # new strings select items to fix
+        fold = (lambda text: text) if self.case_sensitive else str.lower
+        self._old_needles = [(fold(old_str), (old_str, new_str)) for old_str, new_str in self.replacements]
+        self._new_needles = [(fold(new_str), (old_str, new_str)) for old_str, new_str in self.replacements]
+        
         # Colors
         self.RED = '\033[0;31m'
         self.GREEN = '\033[0;32m'
@@ -57,6 +129,33 @@ class GitFileRename:
         self.CYAN = '\033[0;36m'
         self.NC = '\033[0m'
         
+        # Repositories are processed concurrently: output is buffered per
+        # repository thread and written out whole; log writes are serialized
+        self._output = threading.local()
+        self._stdout_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._log_fh = None
+        
+        # Native file finder used for the rename scan when installed
+        # (packaged as fdfind on Debian/Ubuntu)
+        self._fd = shutil.which('fd') or shutil.which('fdfind')
+        
+        # Unchanged copies are reflinked where possible (Linux only); turned
+        # off on the first filesystem that doesn't support it
+        self._reflink = fcntl is not None and sys.platform.startswith('linux')
+        
+        # Results of read-only git queries per checkout, reset whenever git
+        # modifies that checkout
+        self._git_query_cache: Dict[Path, Dict[Tuple[str, ...], str]] = {}
+        
+        # Environment for all spawned commands, built once instead of each
+        # spawn copying os.environ. Optional locks are skipped: nothing here
+        # needs the index refresh that read-only commands would write back
+        self._git_env: Dict[str, str] = dict(os.environ, GIT_OPTIONAL_LOCKS='0')
+        
+        # Directory holding shared SSH connection sockets (_start_ssh_multiplexing)
+        self._ssh_control_dir: Optional[str] = None
+        
     def _parse_replacements(self, replacements_str: str) -> List[Tuple[str, str]]:
         """Parse REPLACEMENTS array from config"""
         # Extract array elements from bash array syntax
@@ -72,34 +171,155 @@ class GitFileRename:
         
         return result
     
+    def _compile_replacements(self, replacements: List[Tuple[str, str]],
+                              as_bytes: bool = False) -> Tuple[Pattern, Dict]:
+        """Compile replacements into an alternation regex and a match -> new string map.
+        
+        With as_bytes the pattern and map work on UTF-8 encoded bytes.
+        """
+        if as_bytes:
+            replacements = [(old_str.encode('utf-8'), new_str.encode('utf-8')) for old_str, new_str in replacements]
+        content_map: Dict = {}
+        for old_str, new_str in replacements:
+            # First mapping wins, as it would when replacements are applied in order
+            content_map.setdefault(old_str if self.case_sensitive else old_str.lower(), new_str)
+        
+        # Longest first so overlapping patterns prefer the most specific match
+        alternatives = sorted(content_map, key=len, reverse=True)
+        pattern = re.compile(
+            (b'|' if as_bytes else '|').join(re.escape(old_str) for old_str in alternatives),
+            0 if self.case_sensitive else re.IGNORECASE
+        )
+        return pattern, content_map
+    
+    def _get_content_matcher(self, replacements: List[Tuple[str, str]]) -> Tuple[Pattern[str], Dict[str, str]]:
+        """Get the compiled pattern and map for a subset of replacements"""
+        key = tuple(replacements)
+        if key not in self._matcher_cache:
+            self._matcher_cache[key] = self._compile_replacements(replacements)
+        return self._matcher_cache[key]
+    
+    def _get_bytes_matcher(self, replacements: List[Tuple[str, str]]) -> Optional[Tuple[Pattern[bytes], Dict[bytes, bytes]]]:
+        """Get a bytes pattern and map for a subset of replacements, or None unless all are ASCII"""
+        key = tuple(replacements)
+        if key not in self._bytes_matcher_cache:
+            ascii_only = all(old_str.isascii() and new_str.isascii() for old_str, new_str in replacements)
+            self._bytes_matcher_cache[key] = self._compile_replacements(replacements, as_bytes=True) if ascii_only else None
+        return self._bytes_matcher_cache[key]
+    
+    def _replacer(self, content_map: Dict[str, str]):
+        """Build the re.sub callback mapping a matched old string to its new string"""
+        # Called once per match: bind the lookup up front and index the match
+        # directly, avoiding the attribute lookups of content_map[m.group(0)]
+        lookup = content_map.__getitem__
+        if self.case_sensitive:
+            return lambda m: lookup(m[0])
+        return lambda m: lookup(m[0].lower())
+    
+    def _out(self, text: str = ''):
+        """Write a line of output, buffered while the current thread processes a repository"""
+        buffer = getattr(self._output, 'buffer', None)
+        if buffer is not None:
+            buffer.write(text + '\n')
+        else:
+            with self._stdout_lock:
+                sys.stdout.write(text + '\n')
+    
+    def _process_buffered(self, process, repo_input: str, dry_run: bool, push: bool, buffered: bool = True) -> int:
+        """Process a repository, writing its output to stdout in one piece at the end.
+        
+        One write per repository instead of one per line, and output of
+        repositories processed concurrently is never interleaved. Without
+        buffered (a single worker) output is written as it happens, so long
+        clones and push retries show live progress. An unexpected error
+        fails only this repository (returns -1) so the others still run to
+        completion.
+        """
+        if buffered:
+            self._output.buffer = io.StringIO()
+        try:
+            return process(repo_input, dry_run, push)
+        except Exception as e:
+            repo_name = self.get_repo_name(repo_input)
+            self.print_error(f"Failed to process repository {repo_name}: {e}")
+            self.log_to_file(f"Repository: {repo_name} | Status: FAILED | Details: {type(e).__name__}: {e}")
+            return -1
+        finally:
+            if buffered:
+                text = self._output.buffer.getvalue()
+                self._output.buffer = None
+                with self._stdout_lock:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+    
     def print_header(self, text: str):
         """Print a header"""
-        print(f"{self.BLUE}{'='*70}{self.NC}")
-        print(f"{self.BLUE}{text}{self.NC}")
-        print(f"{self.BLUE}{'='*70}{self.NC}")
+        self._out(f"{self.BLUE}{'='*70}{self.NC}")
+        self._out(f"{self.BLUE}{text}{self.NC}")
+        self._out(f"{self.BLUE}{'='*70}{self.NC}")
     
     def print_success(self, text: str):
         """Print success message"""
-        print(f"{self.GREEN}✓ {text}{self.NC}")
+        self._out(f"{self.GREEN}✓ {text}{self.NC}")
     
     def print_error(self, text: str):
         """Print error message"""
-        print(f"{self.RED}✗ {text}{self.NC}")
+        self._out(f"{self.RED}✗ {text}{self.NC}")
     
     def print_warning(self, text: str):
         """Print warning message"""
-        print(f"{self.YELLOW}⚠ {text}{self.NC}")
+        self._out(f"{self.YELLOW}⚠ {text}{self.NC}")
     
     def print_info(self, text: str):
         """Print info message"""
-        print(f"{self.CYAN}ℹ {text}{self.NC}")
+        self._out(f"{self.CYAN}ℹ {text}{self.NC}")
     
     def log_to_file(self, message: str):
         """Log message to file"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(self.log_file, 'a') as f:
-            f.write(f"[{timestamp}] {message}\n")
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        with self._log_lock:
+            # Opened once and kept for the whole run (line buffered)
+            if self._log_fh is None:
+                self._log_fh = open(self.log_file, 'a', buffering=1)
+            self._log_fh.write(f"[{timestamp}] {message}\n")
+    
+    def close(self):
+        """Close the log file and shut down shared SSH connections"""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.close()
+                self._log_fh = None
+        
+        if self._ssh_control_dir is not None:
+            for name in os.listdir(self._ssh_control_dir):
+                control_path = os.path.join(self._ssh_control_dir, name)
+                subprocess.run(['ssh', '-o', f'ControlPath={control_path}', '-O', 'exit', 'localhost'],
+                               capture_output=True)
+            shutil.rmtree(self._ssh_control_dir, ignore_errors=True)
+            self._ssh_control_dir = None
+            del self._git_env['GIT_SSH_COMMAND']
+    
+    def _start_ssh_multiplexing(self):
+        """Let all git commands of the run share one SSH connection per host.
+        
+        Only for GIT_AUTH_METHOD=ssh, and never overriding an SSH command the
+        user chose (GIT_SSH_COMMAND, GIT_SSH or core.sshCommand, which
+        GIT_SSH_COMMAND would take precedence over). Not on Windows, whose
+        OpenSSH has no ControlMaster. Clones, fetches and pushes after the
+        first one to a host skip the SSH handshake.
+        """
+        if (self.git_auth_method != 'ssh' or os.name == 'nt' or not shutil.which('ssh')
+                or 'GIT_SSH_COMMAND' in os.environ or 'GIT_SSH' in os.environ):
+            return
+        if self.run_command(['git', 'config', '--get', 'core.sshCommand'], check=False).returncode == 0:
+            return
+        # Socket paths are limited to ~104 bytes and %C alone is 40 characters,
+        # so use a short base rather than $TMPDIR (long on macOS)
+        self._ssh_control_dir = tempfile.mkdtemp(prefix='fr-', dir='/tmp')
+        control_path = shlex.quote(os.path.join(self._ssh_control_dir, '%C'))
+        self._git_env['GIT_SSH_COMMAND'] = (
+            f"ssh -o ControlMaster=auto -o ControlPath={control_path} -o ControlPersist=60s"
+        )
     
     def run_command(self, cmd: List[str], cwd: Optional[Path] = None, 
                    check: bool = True, capture_output: bool = True) -> subprocess.CompletedProcess:
@@ -110,18 +330,31 @@ class GitFileRename:
                 cwd=cwd,
                 capture_output=capture_output,
                 text=True,
-                check=check
+                check=check,
+                env=self._git_env
             )
             return result
         except subprocess.CalledProcessError as e:
             if capture_output:
                 self.print_error(f"Command failed: {' '.join(cmd)}")
                 if e.stderr:
-                    print(e.stderr)
+                    self._out(e.stderr)
             if check:
                 raise
             return e
     
+    def run_command_raw(self, cmd: List[str], cwd: Optional[Path] = None) -> Optional[bytes]:
+        """Execute a command and return its raw stdout, or None if it fails.
+        
+        For commands with large output (e.g. file listings): the bytes are
+        read straight from the pipe, with no text decoding or stderr capture.
+        """
+        with subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              env=self._git_env) as proc:
+            output = proc.stdout.read()
+        return output if proc.returncode == 0 else None
+    
+    @functools.lru_cache(maxsize=None)
     def construct_repo_url(self, repo_input: str) -> str:
         """Construct full repository URL"""
         # If already a full URL, return as-is
@@ -144,6 +377,7 @@ class GitFileRename:
         else:
             return f"{self.git_base_url}/{repo_name}.git"
     
+    @functools.lru_cache(maxsize=None)
     def get_repo_name(self, repo_input: str) -> str:
         """Extract repository name directly from input"""
         # If it's a URL, extract the name
@@ -155,7 +389,7 @@ class GitFileRename:
         # Otherwise use the input directly as the name
         return repo_input.rstrip('.git')
     
-    def clone_repository(self, url: str, target_dir: Path, repo_name: str) -> bool:
+    def clone_repository(self, url: str, target_dir: Path, repo_name: str, push: bool = True) -> bool:
         """Clone a git repository if it doesn't exist"""
         max_retries = 3
         
@@ -165,9 +399,24 @@ class GitFileRename:
         
         self.print_info(f"Cloning repository: {repo_name}")
         
+        # Partial clone of a single branch: file contents are only fetched for
+        # the commits actually checked out (pushing from partial clones works
+        # with any recent git). History is only needed when pushing, so other
+        # runs are also shallow unless CLONE_DEPTH says otherwise (0 = full).
+        cmd = ['git', 'clone', '--filter=blob:none', '--single-branch']
+        if self.base_branch:
+            cmd += ['--branch', self.base_branch]
+        depth = self.clone_depth or ('' if push else '1')
+        if depth and depth != '0':
+            cmd += ['--depth', depth]
+        cmd += [url, str(target_dir)]
+        
         for retry in range(max_retries):
             try:
-                self.run_command(['git', 'clone', url, str(target_dir)], capture_output=True)
+                self.run_command(cmd, capture_output=True)
+                if self.base_branch:
+                    # Cloned with --branch, so the checked out branch is known without asking git
+                    self._invalidate_git_queries(target_dir, current_branch=self.base_branch)
                 self.print_success(f"Successfully cloned to: {target_dir}")
                 self.log_to_file(f"Repository: {repo_name} | Status: CLONED | Details: New clone")
                 return True
@@ -178,21 +427,61 @@ class GitFileRename:
                 else:
                     self.print_error(f"Failed to clone repository after {max_retries} attempts: {url}")
                     if e.stderr:
-                        print(e.stderr)
+                        self._out(e.stderr)
                     self.log_to_file(f"Repository: {repo_name} | Status: FAILED | Details: Clone failed after {max_retries} attempts")
                     return False
         
         return False
     
+    def _git_query(self, repo_dir: Path, *args: str, check: bool = True) -> str:
+        """Run a read-only git command, memoized until the checkout is modified"""
+        queries = self._git_query_cache.setdefault(repo_dir, {})
+        if args not in queries:
+            result = self.run_command(['git', *args], cwd=repo_dir, check=check)
+            queries[args] = result.stdout.strip()
+        return queries[args]
+    
+    def _invalidate_git_queries(self, repo_dir: Path, current_branch: Optional[str] = None):
+        """Drop memoized queries after a git write, optionally recording the branch now checked out"""
+        queries = {}
+        if current_branch is not None:
+            queries[self._CURRENT_BRANCH_QUERY] = current_branch
+        self._git_query_cache[repo_dir] = queries
+    
+    def get_current_branch(self, repo_dir: Path) -> str:
+        """Get the checked out branch"""
+        return self._git_query(repo_dir, *self._CURRENT_BRANCH_QUERY)
+    
+    def sync_with_remote(self, repo_dir: Path, branch: str, check: bool = True) -> Optional[int]:
+        """Fetch branch and fast-forward if no local commits ahead.
+        
+        Returns the number of local commits ahead of the remote, or None if
+        the sync failed and check is False.
+        """
+        # Fast-forward to FETCH_HEAD rather than pull, which would fetch again
+        try:
+            for cmd in (['git', 'fetch', '-q', 'origin', branch],
+                        ['git', 'rev-list', '--count', 'FETCH_HEAD..HEAD']):
+                result = self.run_command(cmd, cwd=repo_dir, check=check)
+                if result.returncode != 0:
+                    return None
+            commits_ahead = int(result.stdout.strip() or '0')
+            
+            if commits_ahead == 0:
+                result = self.run_command(['git', 'merge', '-q', '--ff-only', 'FETCH_HEAD'], cwd=repo_dir, check=check)
+                if result.returncode != 0:
+                    return None
+            return commits_ahead
+        finally:
+            self._invalidate_git_queries(repo_dir, current_branch=branch)
+    
     def checkout_base_branch(self, repo_dir: Path, base_branch: str) -> bool:
         """Checkout base branch and pull if no local commits ahead"""
         if not base_branch:
             return True
         
         try:
-            # Get current branch
-            result = self.run_command(['git', 'branch', '--show-current'], cwd=repo_dir)
-            current_branch = result.stdout.strip()
+            current_branch = self.get_current_branch(repo_dir)
             
             # Checkout if needed
             if current_branch != base_branch:
@@ -206,23 +495,15 @@ class GitFileRename:
                     self.run_command(['git', 'fetch', 'origin', f"{base_branch}:{base_branch}"], cwd=repo_dir, capture_output=True)
                     self.run_command(['git', 'checkout', base_branch], cwd=repo_dir, capture_output=True)
                     self.print_success(f"Fetched and checked out base branch: {base_branch}")
+                self._invalidate_git_queries(repo_dir, current_branch=base_branch)
             else:
                 self.print_info(f"Already on base branch: {base_branch}")
             
             # Fetch and pull if no local commits ahead
-            self.run_command(['git', 'fetch', 'origin', base_branch], cwd=repo_dir, capture_output=True)
-            
-            # Check commits ahead
-            result = self.run_command(
-                ['git', 'rev-list', '--count', f'origin/{base_branch}..HEAD'],
-                cwd=repo_dir,
-                check=False
-            )
-            commits_ahead = int(result.stdout.strip() or '0')
+            self.print_info(f"Fetching origin/{base_branch}...")
+            commits_ahead = self.sync_with_remote(repo_dir, base_branch)
             
             if commits_ahead == 0:
-                self.print_info(f"Pulling latest changes from origin/{base_branch}...")
-                self.run_command(['git', 'pull', 'origin', base_branch], cwd=repo_dir, capture_output=True)
                 self.print_success("Successfully pulled latest changes")
             else:
                 self.print_info(f"Local branch has {commits_ahead} commit(s) ahead of remote - skipping pull")
@@ -232,128 +513,487 @@ class GitFileRename:
             self.print_error(f"Failed to checkout base branch: {base_branch}")
             return False
     
-    def create_or_checkout_branch(self, repo_dir: Path, branch_name: str) -> bool:
-        """Create or checkout working branch"""
+    def create_or_checkout_branch(self, repo_dir: Path, branch_name: str, dry_run: bool = False) -> bool:
+        """Create or checkout working branch.
+        
+        In a dry run a missing branch is not created: it would start from the
+        checked out commit, so the files to scan are the same without it.
+        """
         if not branch_name:
             return True
         
         try:
             # Check if branch exists
-            result = self.run_command(
-                ['git', 'show-ref', '--verify', f'refs/heads/{branch_name}'],
-                cwd=repo_dir,
-                check=False,
-                capture_output=True
-            )
+            branch_ref = self._git_query(repo_dir, 'show-ref', '--verify', f'refs/heads/{branch_name}', check=False)
             
-            if result.returncode == 0:
+            if branch_ref:
                 # Branch exists, check it out
                 self.print_info(f"Checking out existing branch: {branch_name}")
                 self.run_command(['git', 'checkout', branch_name], cwd=repo_dir, capture_output=True)
+                self._invalidate_git_queries(repo_dir, current_branch=branch_name)
                 
-                # Pull if no commits ahead
-                self.run_command(['git', 'fetch', 'origin', branch_name], cwd=repo_dir, capture_output=True, check=False)
-                result = self.run_command(
-                    ['git', 'rev-list', '--count', f'origin/{branch_name}..HEAD'],
-                    cwd=repo_dir,
-                    check=False
-                )
-                commits_ahead = int(result.stdout.strip() or '0')
+                # Pull if no commits ahead (branch may not exist on the remote yet)
+                self.print_info(f"Fetching origin/{branch_name}...")
+                commits_ahead = self.sync_with_remote(repo_dir, branch_name, check=False)
                 
                 if commits_ahead == 0:
-                    self.print_info(f"Pulling latest changes from origin/{branch_name}...")
-                    self.run_command(['git', 'pull', 'origin', branch_name], cwd=repo_dir, capture_output=True, check=False)
                     self.print_success("Successfully pulled latest changes")
-                else:
+                elif commits_ahead:
                     self.print_info(f"Local branch has {commits_ahead} commit(s) ahead of remote - skipping pull")
             else:
                 # Branch doesn't exist
-                if self.auto_create_branch:
+                if self.auto_create_branch and dry_run:
+                    self._out(f"  [DRY RUN] Would create new branch: {branch_name}")
+                elif self.auto_create_branch:
                     self.print_info(f"Creating new branch: {branch_name}")
                     self.run_command(['git', 'checkout', '-b', branch_name], cwd=repo_dir, capture_output=True)
+                    self._invalidate_git_queries(repo_dir, current_branch=branch_name)
                 else:
                     self.print_warning(f"Branch {branch_name} does not exist and AUTO_CREATE_BRANCH is false")
                     return False
             
             return True
         except subprocess.CalledProcessError:
+            self.print_error(f"Failed to checkout branch: {branch_name}")
             return False
     
-    def find_items_with_pattern(self, repo_dir: Path, pattern: str) -> List[Path]:
-        """Find files and directories matching pattern"""
-        matching_items = []
+    def _is_skipped_dir(self, name: str) -> bool:
+        """Check if a directory name is in SKIP_DIRS (or .git)"""
+        return name in self._skip_dirs or (self._skip_glob is not None and self._skip_glob(name) is not None)
+    
+    def _walk(self, top) -> Iterator[os.DirEntry]:
+        """Yield all entries below top (parents before children), pruning skipped directories.
         
-        for item in repo_dir.rglob('*'):
-            # Skip .git directory
-            if '.git' in item.parts:
-                continue
-            
-            item_name = item.name
-            
-            # Check pattern match based on case sensitivity
-            if self.case_sensitive:
-                if pattern in item_name:
-                    matching_items.append(item)
-            else:
-                if pattern.lower() in item_name.lower():
-                    matching_items.append(item)
+        Only directories are pruned (a file named like one is kept), except
+        .git, which is also skipped when it is a gitlink file.
+        """
+        skip_dirs, skip_glob = self._skip_dirs, self._skip_glob
+        stack = [top]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    name = entry.name
+                    if ((name in skip_dirs or (skip_glob and skip_glob(name)))
+                            and (name == '.git' or entry.is_dir(follow_symlinks=False))):
+                        continue
+                    yield entry
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+    
+    def _matching_replacements(self, name: str, needles: List[Tuple[str, Tuple[str, str]]]) -> List[Tuple[str, str]]:
+        """Get the replacements whose needle occurs in name"""
+        if not self.case_sensitive:
+            name = name.lower()
+        return [pair for needle, pair in needles if needle in name]
+    
+    def _list_paths_fd(self, repo_dir: Path) -> Optional[List[str]]:
+        """List all paths below repo_dir (except skipped directories) using fd, parents first.
         
+        fd walks the tree natively and in parallel, which is much faster than
+        a Python walk on large repositories. Returns None if fd fails.
+        """
+        cmd = [self._fd, '--hidden', '--no-ignore', '--print0', '--exclude', '.git']
+        for pattern in self._skip_patterns:
+            if pattern != '.git':
+                # Trailing slash: gitignore-style, matches directories only
+                cmd += ['--exclude', pattern + '/']
+        output = self.run_command_raw(cmd + ['.', str(repo_dir)])
+        if output is None:
+            return None
+        # fd output is unordered; sorting puts every directory before its contents
+        return sorted(os.fsdecode(path).rstrip(os.sep) for path in output.split(b'\0') if path)
+    
+    def find_items_with_patterns(self, repo_dir: Path) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """Find files and directories whose name contains any old string.
+        
+        Returns (path, matching replacements) for each item, in a single walk.
+        """
+        paths = self._list_paths_fd(repo_dir) if self._fd else None
+        if paths is not None:
+            names = ((path, os.path.basename(path)) for path in paths)
+        else:
+            names = ((entry.path, entry.name) for entry in self._walk(repo_dir))
+        
+        matching_items = []
+        for path, name in names:
+            replacements = self._matching_replacements(name, self._old_needles)
+            if replacements:
+                matching_items.append((path, replacements))
         return matching_items
     
-    def replace_content_in_file(self, file_path: Path, old_str: str, new_str: str, verbose: bool = True) -> bool:
-        """Replace content in a single file"""
+    def _has_binary_extension(self, name: str) -> bool:
+        """Check if a file name has a known binary extension"""
+        return os.path.splitext(name)[1].lower() in self._binary_exts
+    
+    def _is_text(self, data: bytes) -> bool:
+        """Check if file data is text (no NUL bytes in its first 8KB)"""
+        return b'\x00' not in data[:8192]
+    
+    def _read_file(self, file_path: Path) -> bytes:
+        """Read a whole file with raw os calls: open, fstat and (normally) one read"""
+        fd = os.open(file_path, os.O_RDONLY)
         try:
-            # Check if it's a text file
-            result = self.run_command(['file', str(file_path)], capture_output=True, check=False)
-            if 'text' not in result.stdout.lower():
-                return False
-            
-            # Read file
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            size = os.fstat(fd).st_size
+            # One byte more than the size so the read also reports EOF
+            data = os.read(fd, size + 1)
+            if len(data) != size:
+                # File changed size since fstat, or hit the per-read cap
+                chunks = [data]
+                while data:
+                    data = os.read(fd, 1 << 20)
+                    chunks.append(data)
+                data = b''.join(chunks)
+            return data
+        finally:
+            os.close(fd)
+    
+    def _create_temp_sibling(self, file_path: Path) -> Tuple[int, str, str]:
+        """Create a temp file next to file_path (or its symlink target).
+        
+        Returns (fd, temp path, target path) for _swap_in_temp.
+        """
+        target = os.path.realpath(file_path) if os.path.islink(file_path) else str(file_path)
+        directory, name = os.path.split(target)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+        return fd, tmp_path, target
+    
+    def _swap_in_temp(self, tmp_path: str, target: str):
+        """Atomically replace target with the finished temp file, keeping target's mode"""
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    
+    def _write_all(self, fd: int, data: bytes):
+        """Write all of data to an open file descriptor"""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    
+    def _write_file(self, file_path: Path, data: bytes):
+        """Replace a file's content atomically via a sibling temp file.
+        
+        A crash mid-write leaves the original intact, and the rename is a
+        metadata-only commit instead of an in-place overwrite.
+        """
+        fd, tmp_path, target = self._create_temp_sibling(file_path)
+        try:
+            try:
+                self._write_all(fd, data)
+            finally:
+                os.close(fd)
+            self._swap_in_temp(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def _match_target(self, data: bytes, replacements: List[Tuple[str, str]]) -> Optional[Tuple[Pattern, Dict, AnyStr]]:
+        """Pick what to match file data with: (pattern, map, subject), or None for binary data.
+        
+        ASCII-only replacements match the raw bytes, skipping the UTF-8
+        decode of the whole file and the re-encode on write.
+        """
+        if not self._is_text(data):
+            return None
+        matcher = self._get_bytes_matcher(replacements)
+        if matcher is not None:
+            return (*matcher, data)
+        return (*self._get_content_matcher(replacements), data.decode('utf-8', errors='ignore'))
+    
+    def _subn_data(self, data: bytes, replacements: List[Tuple[str, str]]) -> Tuple[bytes, int]:
+        """Apply replacements to file data, returning (new data, number of replacements).
+        
+        Matches that leave the content byte-for-byte the same (e.g. 'Foo|foo'
+        matching 'foo' case-insensitively) count as none, so such files are
+        neither rewritten nor reported.
+        """
+        target = self._match_target(data, replacements)
+        if target is None:
+            return data, 0
+        pattern, content_map, subject = target
+        new_subject, count = pattern.subn(self._replacer(content_map), subject)
+        if not count or new_subject == subject:
+            return data, 0
+        if isinstance(new_subject, str):
+            return new_subject.encode('utf-8'), count
+        return new_subject, count
+    
+    def _stream_replace(self, file_path: Path, replacements: List[Tuple[str, str]]) -> Iterator[Tuple[bytes, int]]:
+        """Replace content chunk by chunk, keeping memory bounded for large files.
+        
+        Yields (replaced data, number of replacements in it) per chunk, and
+        nothing for binary files. The last len(longest old string) - 1
+        characters of each chunk are carried into the next one so matches
+        spanning a chunk boundary are still found. ASCII-only replacements
+        work on the raw bytes, as for small files, so the data is kept
+        byte-for-byte apart from the replacements. Matches replaced by the
+        same text are not counted, so such files are left alone.
+        """
+        matcher = self._get_bytes_matcher(replacements)
+        if matcher is not None:
+            pattern, content_map = matcher
+            decode = lambda chunk, final: chunk
+            carry = b''
+        else:
+            pattern, content_map = self._get_content_matcher(replacements)
+            decode = codecs.getincrementaldecoder('utf-8')(errors='ignore').decode
+            carry = ''
+        replacer = self._replacer(content_map)
+        carry_len = max(map(len, content_map), default=1) - 1
+        
+        with open(file_path, 'rb') as f:
+            chunk = f.read(self._STREAM_CHUNK)
+            if not self._is_text(chunk):
+                return
             
-            # Check if old string is present
-            if self.case_sensitive:
-                if old_str not in content:
+            while True:
+                final = not chunk
+                text = carry + decode(chunk, final)
+                # Matches starting before the cutoff fit entirely in text
+                cutoff = len(text) if final else max(len(text) - carry_len, 0)
+                
+                pieces = []
+                count = 0
+                pos = 0
+                for m in pattern.finditer(text):
+                    if m.start() >= cutoff:
+                        break
+                    pieces.append(text[pos:m.start()])
+                    pieces.append(replacer(m))
+                    pos = m.end()
+                    # Matches replaced by themselves change nothing, as in _subn_data
+                    if pieces[-1] != m[0]:
+                        count += 1
+                
+                safe_end = max(pos, cutoff)
+                pieces.append(text[pos:safe_end])
+                carry = text[safe_end:]
+                replaced = carry[:0].join(pieces)
+                yield (replaced if matcher is not None else replaced.encode('utf-8')), count
+                
+                if final:
+                    return
+                chunk = f.read(self._STREAM_CHUNK)
+    
+    def _stream_replace_in_place(self, file_path: Path, replacements: List[Tuple[str, str]]) -> int:
+        """Stream-replace a large file via a sibling temp file, swapped in only if changed"""
+        fd, tmp_path, target = self._create_temp_sibling(file_path)
+        try:
+            count = 0
+            with os.fdopen(fd, 'wb') as out:
+                for data, replaced in self._stream_replace(file_path, replacements):
+                    out.write(data)
+                    count += replaced
+            if count:
+                self._swap_in_temp(tmp_path, target)
+            return count
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def replace_all_content_in_file(self, file_path: Path, replacements: Optional[List[Tuple[str, str]]] = None,
+                                    verbose: bool = True) -> bool:
+        """Apply several replacements to a file in a single read/scan/write pass"""
+        if replacements is None:
+            replacements = self.replacements
+        
+        if self._has_binary_extension(file_path.name):
+            return False
+        
+        try:
+            if os.path.getsize(file_path) > self._STREAM_THRESHOLD:
+                if not self._stream_replace_in_place(file_path, replacements):
                     return False
-                new_content = content.replace(old_str, new_str)
             else:
-                # Case-insensitive replacement
-                pattern = re.compile(re.escape(old_str), re.IGNORECASE)
-                if not pattern.search(content):
+                # Substitution reports whether anything matched, so no separate search pass
+                # (binaries are left unchanged)
+                new_data, count = self._subn_data(self._read_file(file_path), replacements)
+                
+                if count == 0:
                     return False
-                new_content = pattern.sub(new_str, content)
-            
-            # Write back
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+                
+                # Write back
+                self._write_file(file_path, new_data)
             
             if verbose:
-                print(f"      → Replaced content in: {file_path.name}")
+                self._out(f"      → Replaced content in: {file_path.name}")
             
             return True
         except Exception as e:
             return False
     
-    def replace_content_in_directory(self, dir_path: Path, old_str: str, new_str: str) -> int:
-        """Replace content in all files in directory"""
-        count = 0
-        for file_path in dir_path.rglob('*'):
-            if file_path.is_file() and '.git' not in file_path.parts:
-                if self.replace_content_in_file(file_path, old_str, new_str, verbose=False):
-                    count += 1
-        return count
+    def file_contains_replacements(self, file_path: Path, replacements: List[Tuple[str, str]]) -> bool:
+        """Check if a file contains any of the old strings"""
+        if self._has_binary_extension(file_path.name):
+            return False
+        
+        try:
+            if os.path.getsize(file_path) > self._STREAM_THRESHOLD:
+                return any(count for _, count in self._stream_replace(file_path, replacements))
+            return self._subn_data(self._read_file(file_path), replacements)[1] > 0
+        except Exception:
+            return False
+    
+    def _map_files(self, func, items: list) -> list:
+        """Apply func to each item, overlapping file I/O across threads unless sequential"""
+        if self.sequential or len(items) < self._MIN_PARALLEL_FILES:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self._FILE_WORKERS) as executor:
+            return list(executor.map(func, items))
     
-    def create_renamed_copy(self, original_item: Path, old_str: str, new_str: str, dry_run: bool) -> bool:
+    def _copy_file(self, src: str, dst: str):
+        """Copy a file unchanged with its metadata, like shutil.copy2.
+        
+        On copy-on-write filesystems (btrfs, XFS) the copy is a FICLONE
+        reflink that shares the source's blocks instead of copying data.
+        Elsewhere shutil copies in the kernel (sendfile).
+        """
+        if self._reflink:
+            with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+                try:
+                    fcntl.ioctl(fdst.fileno(), self._FICLONE, fsrc.fileno())
+                    cloned = True
+                except OSError as e:
+                    cloned = False
+                    if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS):
+                        # Not supported here; don't try again for the rest of the run
+                        self._reflink = False
+            if cloned:
+                shutil.copystat(src, dst)
+                return
+            # Still empty, and created by us above: copy into it normally
+        shutil.copy2(src, dst)
+    
+    def _copy_transform_file(self, src: str, dst: str, replacements: List[Tuple[str, str]]) -> bool:
+        """Copy a file to a new path, applying the replacements on the way.
+        
+        The source is read once and the copy written once; files that come
+        out unchanged are copied with _copy_file instead. Returns True if
+        the content was changed.
+        """
+        if self._has_binary_extension(os.path.basename(src)):
+            # Never scanned, so copied without reading it here
+            self._copy_file(src, dst)
+            return False
+        if os.path.getsize(src) > self._STREAM_THRESHOLD:
+            # Scan up to the first match: most large files have none and are
+            # then copied in the kernel, the rest are streamed straight to dst
+            if not any(count for _, count in self._stream_replace(src, replacements)):
+                self._copy_file(src, dst)
+                return False
+            with open(dst, 'xb') as out:
+                for data, _ in self._stream_replace(src, replacements):
+                    out.write(data)
+            shutil.copymode(src, dst)
+            return True
+        
+        data, count = self._subn_data(self._read_file(src), replacements)
+        if not count:
+            self._copy_file(src, dst)
+            return False
+        
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            self._write_all(fd, data)
+        finally:
+            os.close(fd)
+        shutil.copymode(src, dst)
+        return True
+    
+    def _copy_transform_dir(self, src: Path, dst: Path, replacements: List[Tuple[str, str]]) -> int:
+        """Copy a directory tree, applying the replacements to file contents on the way.
+        
+        Like shutil.copytree followed by a content pass over the copy, but in
+        a single walk that reads and writes each file once. Names inside the
+        tree are kept. Anything under .git (a file or directory, e.g. of a
+        submodule) or a skipped directory is copied unchanged, as rewriting
+        it would break those checkouts. Returns the number of files whose
+        content changed.
+        """
+        dirs = []
+        files = []
+        stack = [(str(src), str(dst), False)]
+        while stack:
+            src_dir, dst_dir, verbatim = stack.pop()
+            os.makedirs(dst_dir)
+            dirs.append((src_dir, dst_dir))
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    target = os.path.join(dst_dir, entry.name)
+                    is_dir = entry.is_dir()
+                    entry_verbatim = verbatim or entry.name == '.git' or (is_dir and self._is_skipped_dir(entry.name))
+                    if is_dir:
+                        stack.append((entry.path, target, entry_verbatim))
+                    else:
+                        files.append((entry.path, target, entry_verbatim))
+        
+        def copy(paths: Tuple[str, str, bool]) -> bool:
+            file_src, file_dst, verbatim = paths
+            if verbatim:
+                self._copy_file(file_src, file_dst)
+                return False
+            return self._copy_transform_file(file_src, file_dst, replacements)
+        
+        results = self._map_files(copy, files)
+        # Directory metadata last, once nothing more is written into them
+        for src_dir, dst_dir in reversed(dirs):
+            shutil.copystat(src_dir, dst_dir)
+        return sum(results)
+    
+    def scan_and_fix(self, repo_dir: Path, dry_run: bool) -> int:
+        """Fix content below items whose name contains a new string, in one walk.
+        
+        Each file gets the replacements selected by its own name and by the
+        names of its parent directories, applied in a single pass.
+        Returns the number of files fixed (or that would be fixed).
+        """
+        candidates: List[Tuple[Path, List[Tuple[str, str]]]] = []
+        # Replacements selected by each directory visited so far (parents come first)
+        dir_replacements: Dict[str, List[Tuple[str, str]]] = {str(repo_dir): []}
+        
+        for entry in self._walk(repo_dir):
+            inherited = dir_replacements[os.path.dirname(entry.path)]
+            own = self._matching_replacements(entry.name, self._new_needles)
+            if own:
+                replacements = [pair for pair in self.replacements if pair in own or pair in inherited]
+            else:
+                replacements = inherited
+            
+            if entry.is_dir(follow_symlinks=False):
+                dir_replacements[entry.path] = replacements
+                continue
+            
+            if replacements and not self._has_binary_extension(entry.name) and entry.is_file():
+                candidates.append((Path(entry.path), replacements))
+        
+        if dry_run:
+            results = self._map_files(lambda candidate: self.file_contains_replacements(*candidate), candidates)
+        else:
+            results = self._map_files(
+                lambda candidate: self.replace_all_content_in_file(*candidate, verbose=False),
+                candidates
+            )
+        
+        files_fixed = 0
+        for (file_path, replacements), fixed in zip(candidates, results):
+            if not fixed:
+                continue
+            rel_path = file_path.relative_to(repo_dir)
+            if dry_run:
+                mappings = ', '.join(f"'{old_str}' → '{new_str}'" for old_str, new_str in replacements)
+                self._out(f"  [DRY RUN] Would replace {mappings} in: {rel_path}")
+            else:
+                self._out(f"      → Replaced content in: {rel_path}")
+            files_fixed += 1
+        
+        return files_fixed
+    
+    def create_renamed_copy(self, original_item: Path, replacements: List[Tuple[str, str]], dry_run: bool) -> bool:
         """Create a renamed copy of file or directory"""
         item_name = original_item.name
         
         # Perform replacement
-        if self.case_sensitive:
-            new_name = item_name.replace(old_str, new_str)
-        else:
-            pattern = re.compile(re.escape(old_str), re.IGNORECASE)
-            new_name = pattern.sub(new_str, item_name)
+        pattern, name_map = self._get_content_matcher(replacements)
+        new_name = pattern.sub(self._replacer(name_map), item_name)
+        mappings = ', '.join(f"'{old_str}' → '{new_str}'" for old_str, new_str in replacements)
         
         # Skip if name unchanged
         if new_name == item_name:
@@ -363,34 +1003,32 @@ class GitFileRename:
         
         # Check if target exists
         if new_item.exists():
-            print(f"    {self.YELLOW}⚠ Target already exists: {new_name}{self.NC}")
+            self._out(f"    {self.YELLOW}⚠ Target already exists: {new_name}{self.NC}")
             return False
         
         if dry_run:
             if original_item.is_dir():
-                print(f"    [DRY RUN] Would copy directory to: {new_name}/")
-                print(f"    [DRY RUN] Would replace '{old_str}' → '{new_str}' in all files")
+                self._out(f"    [DRY RUN] Would copy directory to: {new_name}/")
+                self._out(f"    [DRY RUN] Would replace {mappings} in all files")
             else:
-                print(f"    [DRY RUN] Would copy file to: {new_name}")
-                print(f"    [DRY RUN] Would replace '{old_str}' → '{new_str}' in file contents")
+                self._out(f"    [DRY RUN] Would copy file to: {new_name}")
+                self._out(f"    [DRY RUN] Would replace {mappings} in file contents")
             return True
         
-        # Copy item
+        # Copy item, replacing content as it is copied
         if original_item.is_dir():
-            shutil.copytree(original_item, new_item)
+            self._copy_transform_dir(original_item, new_item, replacements)
             self.print_success(f"Created directory: {new_name}/")
-            # Replace content in all files
-            self.replace_content_in_directory(new_item, old_str, new_str)
         else:
-            shutil.copy2(original_item, new_item)
+            changed = self._copy_transform_file(str(original_item), str(new_item), replacements)
             self.print_success(f"Created file: {new_name}")
-            # Replace content in file
-            self.replace_content_in_file(new_item, old_str, new_str)
+            if changed:
+                self._out(f"      → Replaced content in: {new_name}")
         
         return True
     
     def process_repository(self, repo_input: str, dry_run: bool, push: bool) -> int:
-        """Process a repository in normal mode"""
+        """Process a repository in normal mode, returning the items copied (-1 on failure)"""
         repo_url = self.construct_repo_url(repo_input)
         repo_name = self.get_repo_name(repo_input)  # Use input directly
         repo_dir = self.work_dir / repo_name
@@ -398,56 +1036,56 @@ class GitFileRename:
         self.print_header(f"Processing repository: {repo_name}")
         
         # Clone
-        if not self.clone_repository(repo_url, repo_dir, repo_name):
-            return 0
+        if not self.clone_repository(repo_url, repo_dir, repo_name, push):
+            return -1
         
         # Checkout base branch
-        if self.base_branch:
-            self.checkout_base_branch(repo_dir, self.base_branch)
+        if self.base_branch and not self.checkout_base_branch(repo_dir, self.base_branch):
+            return -1
         
-        # Create/checkout working branch
-        if self.branch_name:
-            self.create_or_checkout_branch(repo_dir, self.branch_name)
+        # Create/checkout working branch (never continue on the base branch)
+        if self.branch_name and not self.create_or_checkout_branch(repo_dir, self.branch_name, dry_run):
+            return -1
         
         items_copied = 0
         
-        # Process each replacement
-        for old_str, new_str in self.replacements:
-            print()
-            self.print_info(f"Searching for files/directories containing '{old_str}' in name...")
-            
-            matching_items = self.find_items_with_pattern(repo_dir, old_str)
-            
-            if not matching_items:
-                print(f"  No files or directories found with '{old_str}' in name")
-                continue
+        # Find items for all replacements in a single walk
+        self._out()
+        self.print_info("Searching for files/directories containing mapped strings in name...")
+        
+        matching_items = self.find_items_with_patterns(repo_dir)
+        
+        if not matching_items:
+            self._out("  No files or directories found with mapped strings in name")
+        else:
+            self._out(f"  Found {len(matching_items)} item(s)")
+        
+        for item_path, replacements in matching_items:
+            item = Path(item_path)
+            rel_path = item.relative_to(repo_dir)
             
-            print(f"  Found {len(matching_items)} item(s)")
+            if item.is_dir():
+                self._out(f"  Processing directory: {rel_path}/")
+            else:
+                self._out(f"  Processing file: {rel_path}")
             
-            for item in matching_items:
-                rel_path = item.relative_to(repo_dir)
-                
-                if item.is_dir():
-                    print(f"  Processing directory: {rel_path}/")
-                else:
-                    print(f"  Processing file: {rel_path}")
-                
-                if self.create_renamed_copy(item, old_str, new_str, dry_run):
-                    items_copied += 1
+            if self.create_renamed_copy(item, replacements, dry_run):
+                items_copied += 1
         
-        print()
-        print(f"Items copied in {repo_name}: {items_copied}")
+        self._out()
+        self._out(f"Items copied in {repo_name}: {items_copied}")
         
         # Git operations immediately after processing
         if push and not dry_run and items_copied > 0:
-            print()
+            self._out()
             self.print_header(f"Git Push Operations for {repo_name}")
-            self.git_add_commit_push(repo_dir, self.commit_message, repo_name)
+            if not self.git_add_commit_push(repo_dir, self.commit_message, repo_name):
+                return -1
         
         return items_copied
     
     def process_repository_fix_mode(self, repo_input: str, dry_run: bool, push: bool) -> int:
-        """Process a repository in fix mode"""
+        """Process a repository in fix mode, returning the items fixed (-1 on failure)"""
         repo_url = self.construct_repo_url(repo_input)
         repo_name = self.get_repo_name(repo_input)  # Use input directly
         repo_dir = self.work_dir / repo_name
@@ -455,76 +1093,35 @@ class GitFileRename:
         self.print_header(f"Processing repository (FIX MODE): {repo_name}")
         
         # Clone
-        if not self.clone_repository(repo_url, repo_dir, repo_name):
-            return 0
+        if not self.clone_repository(repo_url, repo_dir, repo_name, push):
+            return -1
         
         # Checkout base branch
-        if self.base_branch:
-            self.checkout_base_branch(repo_dir, self.base_branch)
+        if self.base_branch and not self.checkout_base_branch(repo_dir, self.base_branch):
+            return -1
         
-        # Create/checkout working branch
-        if self.branch_name:
-            self.create_or_checkout_branch(repo_dir, self.branch_name)
+        # Create/checkout working branch (never continue on the base branch)
+        if self.branch_name and not self.create_or_checkout_branch(repo_dir, self.branch_name, dry_run):
+            return -1
         
-        items_fixed = 0
+        # Walk once, fixing content below items that contain a NEW pattern
+        self._out()
+        self.print_info("Searching for files/directories containing new strings in name (to fix content)...")
         
-        # Process each replacement - search for NEW pattern
-        for old_str, new_str in self.replacements:
-            print()
-            self.print_info(f"Searching for files/directories containing '{new_str}' in name (to fix content)...")
-            
-            matching_items = self.find_items_with_pattern(repo_dir, new_str)
-            
-            if not matching_items:
-                print(f"  No files or directories found with '{new_str}' in name")
-                continue
-            
-            print(f"  Found {len(matching_items)} item(s) to check for content replacement")
-            
-            for item in matching_items:
-                rel_path = item.relative_to(repo_dir)
-                
-                if item.is_dir():
-                    print(f"  Checking directory: {rel_path}/")
-                    
-                    if dry_run:
-                        print(f"    [DRY RUN] Would replace '{old_str}' → '{new_str}' in all files")
-                        items_fixed += 1
-                    else:
-                        count = self.replace_content_in_directory(item, old_str, new_str)
-                        if count > 0:
-                            self.print_success(f"Fixed content in {count} file(s) in directory")
-                            items_fixed += 1
-                        else:
-                            print("    No changes needed in directory")
-                else:
-                    print(f"  Checking file: {rel_path}")
-                    
-                    if dry_run:
-                        try:
-                            with open(item, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                                if old_str in content:
-                                    print(f"    [DRY RUN] Would replace '{old_str}' → '{new_str}' in file")
-                                    items_fixed += 1
-                                else:
-                                    print("    No changes needed")
-                        except:
-                            print("    No changes needed")
-                    else:
-                        if self.replace_content_in_file(item, old_str, new_str):
-                            items_fixed += 1
-                        else:
-                            print("    No changes needed")
+        items_fixed = self.scan_and_fix(repo_dir, dry_run)
         
-        print()
-        print(f"Items fixed in {repo_name}: {items_fixed}")
+        if items_fixed == 0:
+            self._out("  No changes needed")
+        
+        self._out()
+        self._out(f"Items fixed in {repo_name}: {items_fixed}")
         
         # Git operations immediately after processing
         if push and not dry_run and items_fixed > 0:
-            print()
+            self._out()
             self.print_header(f"Git Push Operations for {repo_name}")
-            self.git_add_commit_push(repo_dir, self.commit_message, repo_name)
+            if not self.git_add_commit_push(repo_dir, self.commit_message, repo_name):
+                return -1
         
         return items_fixed
     
@@ -533,28 +1130,24 @@ class GitFileRename:
         max_retries = 3
         
         try:
-            # Check if there are changes
-            result = self.run_command(['git', 'status', '--porcelain'], cwd=repo_dir)
-            if not result.stdout.strip():
+            branch = self.get_current_branch(repo_dir)
+            
+            # Stage everything; an empty staged diff means nothing to commit
+            self.run_command(['git', 'add', '-A'], cwd=repo_dir, capture_output=True)
+            if self.run_command(['git', 'diff', '--cached', '--quiet'], cwd=repo_dir, check=False).returncode == 0:
                 self.print_info("No changes to commit")
                 return True
             
             self.print_info(f"Git operations in: {repo_name}")
-            
-            # Add changes
-            print("  Adding changes...")
-            self.run_command(['git', 'add', '-A'], cwd=repo_dir, capture_output=True)
+            self._out("  Adding changes...")
             
             # Commit
-            print(f"  Committing with message: '{commit_message}'")
+            self._out(f"  Committing with message: '{commit_message}'")
             self.run_command(['git', 'commit', '-m', commit_message], cwd=repo_dir, capture_output=True)
-            
-            # Get current branch
-            result = self.run_command(['git', 'branch', '--show-current'], cwd=repo_dir)
-            branch = result.stdout.strip()
+            self._invalidate_git_queries(repo_dir, current_branch=branch)
             
             # Push with retry
-            print(f"  Pushing to branch: {branch}")
+            self._out(f"  Pushing to branch: {branch}")
             for retry in range(max_retries):
                 try:
                     self.run_command(['git', 'push', 'origin', branch], cwd=repo_dir, capture_output=True)
@@ -568,7 +1161,7 @@ class GitFileRename:
                     else:
                         self.print_error(f"Failed to push changes after {max_retries} attempts")
                         if e.stderr:
-                            print(e.stderr)
+                            self._out(e.stderr)
                         self.log_to_file(f"Repository: {repo_name} | Status: PUSH_FAILED | Details: Branch: {branch}")
                         return False
             
@@ -576,29 +1169,40 @@ class GitFileRename:
         except subprocess.CalledProcessError as e:
             self.print_error("Git operation failed")
             if e.stderr:
-                print(e.stderr)
+                self._out(e.stderr)
             return False
     
-    def run(self, dry_run: bool = False, push: bool = False, commit_message: Optional[str] = None, fix_mode: Optional[bool] = None):
+    def run(self, dry_run: bool = False, push: bool = False, commit_message: Optional[str] = None, fix_mode: Optional[bool] = None,
+            sequential: bool = False):
         """Main execution"""
+        try:
+            return self._run(dry_run, push, commit_message, fix_mode, sequential)
+        finally:
+            self.close()
+    
+    def _run(self, dry_run: bool, push: bool, commit_message: Optional[str], fix_mode: Optional[bool],
+             sequential: bool):
+        """Process all repositories and print the summary"""
         # Override config with command line args
         if fix_mode is not None:
             self.fix_mode = fix_mode
         
+        self.sequential = sequential
+        
         if commit_message:
             self.commit_message = commit_message
         
         self.print_header("Git File Rename - Starting")
         
         if self.fix_mode:
-            print("MODE: Fix existing files (content replacement only)")
+            self._out("MODE: Fix existing files (content replacement only)")
         else:
-            print("MODE: Copy and rename files/directories")
+            self._out("MODE: Copy and rename files/directories")
         
-        print(f"Repository list: {self.repo_list_file}")
-        print(f"Working directory: {self.work_dir}")
-        print(f"Log file: {self.log_file}")
-        print()
+        self._out(f"Repository list: {self.repo_list_file}")
+        self._out(f"Working directory: {self.work_dir}")
+        self._out(f"Log file: {self.log_file}")
+        self._out()
         
         # Initialize log
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
@@ -614,62 +1218,89 @@ class GitFileRename:
             self.print_error("No replacements defined")
             return 1
         
-        print()
+        if self.clone_depth and not self.clone_depth.isdigit():
+            self.print_warning(f"Ignoring invalid CLONE_DEPTH: {self.clone_depth} (expected a number)")
+            self.clone_depth = ''
+        
+        self._out()
         self.print_info(f"Replacements: {len(self.replacements)}")
         self.print_info(f"Case sensitive: {self.case_sensitive}")
         self.print_info(f"Base branch: {self.base_branch or 'current'}")
         self.print_info(f"Working branch: {self.branch_name or 'current'}")
         
-        print()
-        print("Replacement mappings:")
+        self._out()
+        self._out("Replacement mappings:")
         for old_str, new_str in self.replacements:
-            print(f"  '{old_str}' → '{new_str}'")
+            self._out(f"  '{old_str}' → '{new_str}'")
         
         # Create work dir
         self.work_dir.mkdir(parents=True, exist_ok=True)
         
+        self._start_ssh_multiplexing()
+        
         # Process repositories
         total_items = 0
         successful_repos = 0
-        total_repos = 0
         
         with open(self.repo_list_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                
-                total_repos += 1
-                print()
-                
-                if self.fix_mode:
-                    items = self.process_repository_fix_mode(line, dry_run, push)
-                else:
-                    items = self.process_repository(line, dry_run, push)
-                
+            # Skip comments and empty lines
+            repos = [line.strip() for line in f]
+            repos = [repo for repo in repos if repo and not repo.startswith('#')]
+        
+        # Entries naming the same repository share one checkout, so process each once
+        unique_repos = {}
+        for repo in repos:
+            repo_name = self.get_repo_name(repo)
+            if repo_name in unique_repos:
+                self.print_warning(f"Skipping duplicate repository entry: {repo}")
+            else:
+                unique_repos[repo_name] = repo
+        repos = list(unique_repos.values())
+        
+        total_repos = len(repos)
+        process = self.process_repository_fix_mode if self.fix_mode else self.process_repository
+        
+        # Clone/fetch and tree walks are I/O bound, so repos are processed concurrently
+        if repos:
+            if self.sequential:
+                max_workers = 1
+            elif self.repo_workers.isdigit() and int(self.repo_workers) > 0:
+                max_workers = min(len(repos), int(self.repo_workers))
+            else:
+                max_workers = min(len(repos), (os.cpu_count() or 1) * 2)
+            if max_workers == 1:
+                # No pool and no buffering for a single repository (or -s)
+                results = [self._process_buffered(process, repo, dry_run, push, buffered=False) for repo in repos]
+            else:
+                # Buffered output would hide which repository a git credential
+                # prompt belongs to, and concurrent prompts would share the
+                # terminal, so git fails instead of prompting
+                self._git_env['GIT_TERMINAL_PROMPT'] = '0'
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [executor.submit(self._process_buffered, process, repo, dry_run, push) for repo in repos]
+                    results = [future.result() for future in as_completed(futures)]
+            for items in results:
                 if items >= 0:
                     successful_repos += 1
                     total_items += items
         
         # Summary
-        print()
+        self._out()
         self.print_header("Summary")
         
-        print(f"Total items {'fixed' if self.fix_mode else 'copied'}: {total_items}")
-        print(f"Successful repositories: {successful_repos}/{total_repos}")
-        print(f"Log file: {self.log_file}")
+        self._out(f"Total items {'fixed' if self.fix_mode else 'copied'}: {total_items}")
+        self._out(f"Successful repositories: {successful_repos}/{total_repos}")
+        self._out(f"Log file: {self.log_file}")
         
         if dry_run:
-            print()
+            self._out()
             self.print_warning("[DRY RUN MODE] No files were actually copied or committed")
         
         self.log_to_file("=== Script Completed ===")
         self.log_to_file(f"Total items: {total_items}")
         self.log_to_file(f"Successful repos: {successful_repos}/{total_repos}")
         
-        print()
+        self._out()
         if successful_repos == total_repos:
             self.print_success("Operation completed successfully!")
             return 0
@@ -687,25 +1318,17 @@ def parse_bash_config(config_file: str) -> Dict[str, str]:
             content = f.read()
         
         # Extract simple variable assignments
-        var_pattern = r'^([A-Z_]+)=(["\']?)(.+?)\2\s*$'
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
+        for match in _VAR_RE.finditer(content):
+            var_name, _, var_value = match.groups()
             
-            match = re.match(var_pattern, line)
-            if match:
-                var_name, _, var_value = match.groups()
-                
-                # Handle environment variable substitutions
-                var_value = re.sub(r'\$\{([^}]+):-([^}]*)\}', r'\2', var_value)
-                var_value = re.sub(r'\$\{([^}]+)\}', '', var_value)
-                
-                config[var_name] = var_value
+            # Handle environment variable substitutions
+            var_value = _DEFAULT_SUBST_RE.sub(r'\2', var_value)
+            var_value = _VAR_SUBST_RE.sub('', var_value)
+            
+            config[var_name] = var_value
         
         # Extract REPLACEMENTS array
-        replacements_pattern = r'declare -a REPLACEMENTS=\((.*?)\)'
-        match = re.search(replacements_pattern, content, re.DOTALL)
+        match = _REPLACEMENTS_RE.search(content)
         if match:
             config['REPLACEMENTS'] = match.group(1)
     
@@ -727,6 +1350,7 @@ Examples:
   %(prog)s -d                        # Dry run (don't copy files)
   %(prog)s -p -m "Add new files"    # Copy files and push to git
   %(prog)s --fix-content             # Fix mode: update existing files
+  %(prog)s -s                        # Process one repository/file at a time
         """
     )
     parser.add_argument(
@@ -754,6 +1378,11 @@ Examples:
         dest='fix_mode',
         help='Fix mode: only update content in existing files (no copying)'
     )
+    parser.add_argument(
+        '-s', '--sequential',
+        action='store_true',
+        help='Process repositories and files one at a time (deterministic output order)'
+    )
     
     args = parser.parse_args()
     
@@ -766,7 +1395,8 @@ Examples:
         dry_run=args.dry_run,
         push=args.push,
         commit_message=args.message,
-        fix_mode=args.fix_mode
+        fix_mode=args.fix_mode,
+        sequential=args.sequential
     )
     sys.exit(exit_code)
 